@@ -4,6 +4,7 @@ Helper functions for geometric calculations
 """
 
 import math
+import numpy as np
 
 
 class GeometryUtils:
@@ -55,18 +56,12 @@ class GeometryUtils:
             points2: Second set of points
             
         Returns:
-            2D list of distances
+            2D array of distances (len(points1) x len(points2))
         """
-        distances = []
+        from scipy.spatial.distance import cdist
         
-        for p1 in points1:
-            row = []
-            for p2 in points2:
-                dist = GeometryUtils.euclidean_distance(
-                    p1["x"], p1["y"],
-                    p2["x"], p2["y"]
-                )
-                row.append(dist)
-            distances.append(row)
+        # reshape keeps empty inputs 2D so they give an empty matrix instead of an error
+        xy1 = np.asarray([[p["x"], p["y"]] for p in points1], dtype=np.float64).reshape(-1, 2)
+        xy2 = np.asarray([[p["x"], p["y"]] for p in points2], dtype=np.float64).reshape(-1, 2)
         
-        return distances
\ No newline at end of file
+        return cdist(xy1, xy2)
\ No newline at end of file
@@ -4,14 +4,112 @@ Pure algorithm logic independent of ArcGIS
 """
 
 import arcpy
-import random
-from geometry_utils import GeometryUtils
+import numpy as np
+
+try:
+    import numba
+    from numba import prange
+except ImportError:  # Optional - the NumPy path below is used without it
+    numba = None
+    prange = range
+
+# Points per distance tile in the NumPy path, sized so a (block, K) float32
+# tile stays in L2 cache for typical facility counts
+_BLOCK_SIZE = 4096
+
+# Record layout for facility locations handed to outputs and summaries
+FACILITY_DTYPE = np.dtype([("id", "<i4"), ("x", "<f8"), ("y", "<f8")])
+
+
+def _lloyd_step_kernel(P, F, half_separation, assignments, lower, num_chunks):
+    """
+    Single compiled pass of assignment, centroid sums and objective
+    
+    Points keep their current facility without a full scan when the distance
+    to it is within half the gap to that facility's nearest neighbour, or
+    within the point's lower bound on the distance to any other facility.
+    Otherwise every facility is checked and the lower bound is reset to the
+    second-nearest distance.
+    
+    Points are split into contiguous chunks that run in parallel. Each chunk
+    accumulates into its own row of the sum/count buffers, which are reduced
+    once at the end, so no two threads write the same memory.
+    
+    Args:
+        P: (N, 2) array of point coordinates
+        F: (K, 2) array of facility coordinates
+        half_separation: (K,) half distance from each facility to its nearest
+            other facility
+        assignments: (N,) facility IDs, updated in place
+        lower: (N,) lower bounds on the distance to any non-assigned
+            facility, updated in place
+        num_chunks: Number of chunks to split the points into (thread count)
+        
+    Returns:
+        Tuple of ((K, 2) coordinate sums, counts, objective)
+    """
+    num_points = P.shape[0]
+    num_facilities = F.shape[0]
+    
+    local_sums = np.zeros((num_chunks, num_facilities, 2))
+    local_counts = np.zeros((num_chunks, num_facilities), dtype=np.int64)
+    local_objective = np.zeros(num_chunks)
+    
+    for c in prange(num_chunks):
+        start = c * num_points // num_chunks
+        end = (c + 1) * num_points // num_chunks
+        
+        for i in range(start, end):
+            # Planar XY only, so the dimension loop is written out by hand
+            px = P[i, 0]
+            py = P[i, 1]
+            
+            nearest = assignments[i]
+            dx = px - F[nearest, 0]
+            dy = py - F[nearest, 1]
+            dist = np.sqrt(dx * dx + dy * dy)
+            
+            if dist > max(half_separation[nearest], lower[i]):
+                # Bounds failed - scan every facility for the two nearest
+                nearest = 0
+                min_d2 = np.inf
+                second_d2 = np.inf
+                for k in range(num_facilities):
+                    dx = px - F[k, 0]
+                    dy = py - F[k, 1]
+                    d2 = dx * dx + dy * dy
+                    if d2 < min_d2:
+                        second_d2 = min_d2
+                        min_d2 = d2
+                        nearest = k
+                    elif d2 < second_d2:
+                        second_d2 = d2
+                
+                assignments[i] = nearest
+                lower[i] = np.sqrt(second_d2)
+                dist = np.sqrt(min_d2)
+            
+            local_counts[c, nearest] += 1
+            local_sums[c, nearest, 0] += px
+            local_sums[c, nearest, 1] += py
+            local_objective[c] += dist
+    
+    return local_sums.sum(axis=0), local_counts.sum(axis=0), local_objective.sum()
+
+
+if numba is not None:
+    # Fast-math without the no-NaN/no-Inf flags, the bounds rely on inf
+    _lloyd_step_kernel = numba.njit(
+        cache=True, parallel=True,
+        fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}
+    )(_lloyd_step_kernel)
 
 
 class LloydsAlgorithm:
     """Core Lloyd's algorithm implementation"""
     
-    def __init__(self, num_facilities, max_iterations, convergence_threshold, random_seed=42):
+    def __init__(self, num_facilities, max_iterations, convergence_threshold, random_seed=42,
+                 verbose=False):
         """
         Initialize algorithm parameters
         
@@ -20,243 +118,335 @@ class LloydsAlgorithm:
             max_iterations: Maximum iterations to run
             convergence_threshold: Stop when facilities move less than this distance
             random_seed: Seed for random number generator (default: 42)
+            verbose: Report objective, cluster sizes and movement for every
+                iteration (default: False, progress bar only)
         """
         self.num_facilities = num_facilities
         self.max_iterations = max_iterations
         self.convergence_threshold = convergence_threshold
         self.random_seed = random_seed
-        self.geo_utils = GeometryUtils()
+        self.verbose = verbose
     
-    def run(self, points):
+    def run(self, points_xy):
         """
         Execute Lloyd's algorithm
         
         Args:
-            points: List of demand point dictionaries with 'xy' and 'oid' keys
+            points_xy: (N, 2) array of demand point coordinates
             
         Returns:
-            List of iteration history dictionaries
+            List of iteration history dictionaries. 'facilities' is a (K,)
+            FACILITY_DTYPE array of facility IDs and coordinates, and
+            'assignments' holds one facility ID per point.
         """
-        # Initialize facilities
-        facilities = self._initialize_facilities(points)
-        arcpy.AddMessage(f"Initialized {len(facilities)} facilities randomly")
+        # Point coordinates as an (N, 2) float32 array for vectorized distance
+        # math. Shifting to the mean keeps float32 precise on large projected
+        # coordinates; facility locations are shifted back when recorded.
+        xy = np.asarray(points_xy, dtype=np.float64)
+        self._origin = xy.mean(0)
+        self._P = (xy - self._origin).astype(np.float32)
+        self._P2 = (self._P**2).sum(1)
+        
+        # Per-point assignment and lower bound on the distance to every other
+        # facility, carried between steps to skip most full distance scans.
+        # Zero bounds force a full scan on the first step.
+        self._assignments = np.zeros(len(self._P), dtype=np.int64)
+        self._lower = np.zeros(len(self._P), dtype=np.float64)
+        self._bound_facilities = None
+        
+        # Initialize facilities as a (K, 2) coordinate array
+        facilities = self._initialize_facilities()
+        arcpy.AddMessage(f"Initialized {len(facilities)} facilities with k-means++ seeding")
         arcpy.AddMessage("")
         
-        # Run iterations
+        # Compact storage for every recorded state (one more than the
+        # iteration limit to hold the converged state). History entries are
+        # views into these arrays rather than per-iteration copies.
+        num_states = self.max_iterations + 1
+        assignment_dtype = np.uint16 if self.num_facilities < 65536 else np.int32
+        self._facility_history = np.empty((num_states, self.num_facilities), dtype=FACILITY_DTYPE)
+        self._facility_history["id"] = np.arange(self.num_facilities)
+        self._assignment_history = np.empty((num_states, len(self._P)), dtype=assignment_dtype)
+        
+        # Run iterations. Each AddMessage is a round trip to the host
+        # application, so progress goes through the progressor and per-iteration
+        # detail is only sent when verbose, as a single message.
         iteration_history = []
         converged = False
+        arcpy.SetProgressor("step", "Running Lloyd's algorithm...", 0, self.max_iterations, 1)
         
         for iteration in range(self.max_iterations):
-            arcpy.AddMessage(f"Iteration {iteration + 1}/{self.max_iterations}")
+            arcpy.SetProgressorPosition(iteration)
             
-            # Assignment step
-            assignments = self._assign_points_to_facilities(points, facilities)
-            
-            # Calculate metrics
-            objective = self._calculate_objective_function(points, facilities, assignments)
-            cluster_sizes = self._calculate_cluster_sizes(assignments)
-            
-            arcpy.AddMessage(f"  Objective function: {objective:.2f}")
-            arcpy.AddMessage(f"  Cluster sizes: {cluster_sizes}")
+            # Assignment, objective and centroid update in one pass
+            assignments, objective, new_facilities, counts = self._lloyd_step(facilities)
+            cluster_sizes = counts.tolist()
             
             # Store iteration data
-            iteration_history.append({
-                "iteration": iteration + 1,
-                "facilities": [f.copy() for f in facilities],
-                "objective": objective,
-                "assignments": assignments.copy(),
-                "cluster_sizes": cluster_sizes
-            })
-            
-            # Update step - calculate new centroids
-            new_facilities = self._calculate_centroids(points, facilities, assignments)
+            self._record_state(iteration_history, iteration + 1, facilities,
+                               objective, assignments, cluster_sizes)
             
             # Convergence check
             max_movement = self._calculate_max_movement(facilities, new_facilities)
-            arcpy.AddMessage(f"  Maximum facility movement: {max_movement:.4f}")
+            
+            if self.verbose:
+                arcpy.AddMessage(
+                    f"Iteration {iteration + 1}/{self.max_iterations}\n"
+                    f"  Objective function: {objective:.2f}\n"
+                    f"  Cluster sizes: {cluster_sizes}\n"
+                    f"  Maximum facility movement: {max_movement:.4f}\n"
+                )
             
             if max_movement < self.convergence_threshold:
                 arcpy.AddMessage(f"\nConverged at iteration {iteration + 1}!")
                 converged = True
                 facilities = new_facilities
                 
-                # Store final state
-                final_assignments = self._assign_points_to_facilities(points, facilities)
-                final_objective = self._calculate_objective_function(points, facilities, final_assignments)
-                final_cluster_sizes = self._calculate_cluster_sizes(final_assignments)
-                
-                iteration_history.append({
-                    "iteration": iteration + 2,
-                    "facilities": [f.copy() for f in facilities],
-                    "objective": final_objective,
-                    "assignments": final_assignments.copy(),
-                    "cluster_sizes": final_cluster_sizes
-                })
+                # Store final state. No facility moved more than the threshold,
+                # so the assignments, objective and cluster sizes of the step
+                # that converged stand for the final facilities instead of
+                # another pass over every point.
+                self._record_state(iteration_history, iteration + 2, facilities,
+                                   objective, assignments, cluster_sizes)
                 break
             
             facilities = new_facilities
-            arcpy.AddMessage("")
         
+        arcpy.ResetProgressor()
         if not converged:
             arcpy.AddMessage(f"\nReached maximum iterations ({self.max_iterations})")
         
         return iteration_history
     
-    def _initialize_facilities(self, points):
+    def _record_state(self, iteration_history, iteration, facilities, objective,
+                      assignments, cluster_sizes):
         """
-        Initialize facility locations randomly from demand points
+        Copy a state into the history arrays and append its history entry
         
         Args:
-            points: List of demand points
-            
+            iteration_history: List of iteration dictionaries to append to
+            iteration: Iteration number to record
+            facilities: (K, 2) array of facility coordinates relative to the
+                point mean
+            objective: Total distance for this state
+            assignments: Array of facility IDs (one per point)
+            cluster_sizes: List of cluster sizes
+        """
+        state = len(iteration_history)
+        self._facility_history["x"][state] = facilities[:, 0] + self._origin[0]
+        self._facility_history["y"][state] = facilities[:, 1] + self._origin[1]
+        self._assignment_history[state] = assignments
+        iteration_history.append({
+            "iteration": iteration,
+            "facilities": self._facility_history[state],
+            "objective": objective,
+            "assignments": self._assignment_history[state],
+            "cluster_sizes": cluster_sizes
+        })
+    
+    def _initialize_facilities(self):
+        """
+        Initialize facility locations from demand points with k-means++ seeding
+        
+        The first facility is a uniformly random point. Each further facility
+        is drawn with probability proportional to the squared distance from
+        the nearest facility chosen so far, which spreads the starting
+        locations out and cuts the iterations needed to converge.
+        
         Returns:
-            List of facility dictionaries with 'id', 'x', 'y' keys
+            (K, 2) array of facility coordinates relative to the point mean,
+            row index is the facility ID
         """
-        random.seed(self.random_seed)  # Use instance variable instead of hardcoded 42
-        selected_indices = random.sample(range(len(points)), self.num_facilities)
+        rng = np.random.default_rng(self.random_seed)
+        num_points = len(self._P)
         
-        facilities = []
-        for i, idx in enumerate(selected_indices):
-            facilities.append({
-                "id": i,
-                "x": points[idx]["xy"][0],
-                "y": points[idx]["xy"][1]
-            })
+        facilities = np.empty((self.num_facilities, 2), dtype=np.float64)
+        facilities[0] = self._P[rng.integers(num_points)]
+        
+        # Squared distance from each point to its nearest chosen facility
+        diff = self._P - facilities[0]
+        min_d2 = (diff * diff).sum(1)
+        
+        for k in range(1, self.num_facilities):
+            total = min_d2.sum()
+            if total > 0:
+                idx = rng.choice(num_points, p=min_d2 / total)
+            else:
+                # Every point already sits on a facility
+                idx = rng.integers(num_points)
+            
+            facilities[k] = self._P[idx]
+            diff = self._P - facilities[k]
+            np.minimum(min_d2, (diff * diff).sum(1), out=min_d2)
         
         return facilities
     
-    def _assign_points_to_facilities(self, points, facilities):
+    def _lloyd_step(self, facilities):
         """
-        Assign each point to its nearest facility
+        Run one assignment and update pass over all points
+        
+        Assigns each point to its nearest facility, totals the distances and
+        computes the new centroids without walking the point list again.
+        Triangle-inequality bounds carried from the previous step (Hamerly's
+        method) let most points keep their facility after checking a single
+        distance, so only points near a cluster boundary are fully rescanned.
         
         Args:
-            points: List of demand points
-            facilities: List of facility locations
+            facilities: (K, 2) array of facility coordinates
             
         Returns:
-            List of facility IDs (one per point)
+            Tuple of (assignments array, objective, new facility array,
+            cluster size array)
         """
-        assignments = []
+        self._update_lower_bounds(facilities)
         
-        for point in points:
-            min_dist = float('inf')
-            nearest_facility = 0
+        # Distances are computed in float32 to match the points; centroids
+        # are accumulated and stored in float64
+        F = facilities.astype(np.float32)
+        half_separation = self._half_separation(F)
+        assignments = self._assignments
+        
+        if numba is not None:
+            sums, counts, objective = _lloyd_step_kernel(
+                self._P, F, half_separation, assignments, self._lower,
+                numba.get_num_threads())
+        else:
+            # Distance to the current facility. Taken from the coordinate
+            # differences, since the expanded form loses precision for points
+            # sitting on top of a facility.
+            diff = self._P - F[assignments]
+            dist = np.sqrt((diff * diff).sum(1))
             
-            for facility in facilities:
-                dist = self.geo_utils.euclidean_distance(
-                    point["xy"][0], point["xy"][1],
-                    facility["x"], facility["y"]
-                )
+            # Rescan only the points whose bounds do not rule out a closer
+            # facility
+            rows = np.flatnonzero(dist > np.maximum(half_separation[assignments], self._lower))
+            
+            # Blocks of rows keep each distance tile cache-sized instead of
+            # building one (N, K) matrix
+            for start in range(0, len(rows), _BLOCK_SIZE):
+                block = rows[start:start + _BLOCK_SIZE]
+                d2 = self._squared_distances(F, block)
+                nearest = d2.argmin(1)
+                
+                # Second-nearest distance becomes the new lower bound
+                d2[np.arange(len(block)), nearest] = np.inf
+                self._lower[block] = np.sqrt(d2.min(1))
                 
-                if dist < min_dist:
-                    min_dist = dist
-                    nearest_facility = facility["id"]
+                assignments[block] = nearest
+                diff = self._P[block] - F[nearest]
+                dist[block] = np.sqrt((diff * diff).sum(1))
             
-            assignments.append(nearest_facility)
+            # Objective - total distance to the assigned facilities
+            objective = dist.sum(dtype=np.float64)
+            
+            # Per-facility coordinate sums in one C pass per axis
+            counts = self._calculate_cluster_sizes(assignments)
+            sums = np.stack([
+                np.bincount(assignments, weights=self._P[:, 0], minlength=len(facilities)),
+                np.bincount(assignments, weights=self._P[:, 1], minlength=len(facilities))
+            ], axis=1)
+        
+        # Update step - calculate new centroids
+        new_facilities = self._calculate_centroids(facilities, sums, counts)
         
-        return assignments
+        return assignments, float(objective), new_facilities, counts
     
-    def _calculate_objective_function(self, points, facilities, assignments):
+    def _update_lower_bounds(self, facilities):
         """
-        Calculate total distance from points to assigned facilities
+        Loosen the per-point lower bounds by how far the facilities moved
+        
+        A point's lower bound covers every facility except its own, so it is
+        reduced by the largest move among those other facilities.
         
         Args:
-            points: List of demand points
-            facilities: List of facility locations
-            assignments: List of facility assignments
+            facilities: (K, 2) array of facility coordinates for the next step
+        """
+        previous = self._bound_facilities
+        self._bound_facilities = facilities.copy()
+        if previous is None or len(facilities) < 2:
+            return
+        
+        shift = np.linalg.norm(facilities - previous, axis=1)
+        farthest = shift.argmax()
+        largest, runner_up = np.partition(shift, -2)[[-1, -2]]
+        self._lower -= np.where(self._assignments == farthest, runner_up, largest)
+    
+    def _half_separation(self, F):
+        """
+        Calculate half the distance from each facility to its nearest neighbour
+        
+        A point closer than this to its facility cannot be closer to any
+        other facility.
+        
+        Args:
+            F: (K, 2) array of facility coordinates
             
         Returns:
-            Total distance (float)
+            (K,) array, inf when there is only one facility
+        """
+        diff = F[:, None, :] - F[None, :, :]
+        d2 = (diff * diff).sum(-1)
+        np.fill_diagonal(d2, np.inf)
+        return 0.5 * np.sqrt(d2.min(1))
+    
+    def _squared_distances(self, F, rows):
         """
-        total_distance = 0.0
+        Calculate squared distances from a subset of points to every facility
         
-        for i, point in enumerate(points):
-            facility_id = assignments[i]
-            facility = facilities[facility_id]
+        Uses |p - f|^2 = |p|^2 + |f|^2 - 2 p.f so the bulk of the work is a
+        single matrix product instead of an (N, K, 2) temporary.
+        
+        Args:
+            F: (K, 2) array of facility coordinates
+            rows: Indices of the points to measure
             
-            dist = self.geo_utils.euclidean_distance(
-                point["xy"][0], point["xy"][1],
-                facility["x"], facility["y"]
-            )
-            total_distance += dist
+        Returns:
+            (len(rows), K) array of squared distances
+        """
+        P = self._P[rows]
+        d2 = self._P2[rows, None] + (F * F).sum(1)[None, :] - 2.0 * (P @ F.T)
         
-        return total_distance
+        # Rounding can push near-zero distances slightly negative
+        return np.maximum(d2, 0.0, out=d2)
     
     def _calculate_cluster_sizes(self, assignments):
         """
         Calculate number of points assigned to each facility
         
         Args:
-            assignments: List of facility assignments
+            assignments: Array of facility assignments
             
         Returns:
-            List of cluster sizes
+            Array of cluster sizes
         """
-        sizes = [0] * self.num_facilities
-        for assignment in assignments:
-            sizes[assignment] += 1
-        return sizes
+        return np.bincount(assignments, minlength=self.num_facilities)
     
-    def _calculate_centroids(self, points, facilities, assignments):
+    def _calculate_centroids(self, facilities, sums, counts):
         """
         Calculate centroid of points assigned to each facility
         
         Args:
-            points: List of demand points
-            facilities: List of current facility locations
-            assignments: List of facility assignments
+            facilities: (K, 2) array of current facility locations
+            sums: (K, 2) array of summed coordinates of the assigned points
+            counts: (K,) array of cluster sizes
             
         Returns:
-            List of new facility locations (centroids)
+            (K, 2) array of new facility locations (centroids)
         """
-        new_facilities = []
-        
-        for facility in facilities:
-            facility_id = facility["id"]
-            
-            # Find all points assigned to this facility
-            assigned_points = [
-                points[i] for i, assign in enumerate(assignments) 
-                if assign == facility_id
-            ]
-            
-            if len(assigned_points) == 0:
-                # No points assigned - keep facility in same location
-                new_facilities.append(facility.copy())
-            else:
-                # Calculate centroid
-                sum_x = sum(p["xy"][0] for p in assigned_points)
-                sum_y = sum(p["xy"][1] for p in assigned_points)
-                centroid_x = sum_x / len(assigned_points)
-                centroid_y = sum_y / len(assigned_points)
-                
-                new_facilities.append({
-                    "id": facility_id,
-                    "x": centroid_x,
-                    "y": centroid_y
-                })
-        
-        return new_facilities
+        # No points assigned - keep facility in same location
+        empty = counts == 0
+        centroids = sums / np.maximum(counts, 1)[:, None]
+        return np.where(empty[:, None], facilities, centroids)
     
     def _calculate_max_movement(self, old_facilities, new_facilities):
         """
         Calculate maximum distance any facility moved
         
         Args:
-            old_facilities: List of previous facility locations
-            new_facilities: List of new facility locations
+            old_facilities: (K, 2) array of previous facility locations
+            new_facilities: (K, 2) array of new facility locations
             
         Returns:
             Maximum movement distance (float)
         """
-        max_dist = 0.0
-        
-        for old_fac, new_fac in zip(old_facilities, new_facilities):
-            dist = self.geo_utils.euclidean_distance(
-                old_fac["x"], old_fac["y"],
-                new_fac["x"], new_fac["y"]
-            )
-            if dist > max_dist:
-                max_dist = dist
-        
-        return max_dist
\ No newline at end of file
+        return float(np.linalg.norm(new_facilities - old_facilities, axis=1).max())
\ No newline at end of file
@@ -4,6 +4,7 @@ Standalone script version with Voronoi polygons and symbology
 """
 
 import arcpy
+import numpy as np
 import sys
 import os
 
@@ -154,6 +155,18 @@ def main():
         except:
             pass  # Use default if parameter doesn't exist or is invalid
         
+        # np.random.default_rng rejects negative seeds
+        if random_seed < 0:
+            arcpy.AddError("Random seed must be zero or greater")
+            return
+        
+        # Check if parameter 10 exists (Verbose Messages - optional)
+        verbose = False  # Default value
+        try:
+            verbose = arcpy.GetParameterAsText(10).lower() == "true"
+        except:
+            pass  # Use default if parameter doesn't exist
+        
         # Configure environment
         arcpy.env.workspace = output_workspace
         arcpy.env.overwriteOutput = True
@@ -171,28 +184,25 @@ def main():
             arcpy.AddMessage(f"Creating Voronoi polygons: Yes")
         arcpy.AddMessage("")
         
-        # Load demand points
-        points = []
+        # Load demand points in one call as coordinate and OID arrays
         spatial_ref = arcpy.Describe(input_points).spatialReference
+        records = arcpy.da.FeatureClassToNumPyArray(input_points, ["SHAPE@XY", "OID@"])
+        points_xy = np.ascontiguousarray(records["SHAPE@XY"], dtype=np.float64)
+        point_oids = records["OID@"].astype(np.int64)
+        num_points = len(points_xy)
         
-        with arcpy.da.SearchCursor(input_points, ["SHAPE@XY", "OID@"]) as cursor:
-            for row in cursor:
-                points.append({"xy": row[0], "oid": row[1]})
-        
-        arcpy.AddMessage(f"Loaded {len(points)} demand points")
+        arcpy.AddMessage(f"Loaded {num_points} demand points")
         arcpy.AddMessage("")
         
         # Validate
-        if len(points) < num_facilities:
-            arcpy.AddError(f"Cannot place {num_facilities} facilities with only {len(points)} points")
+        if num_points < num_facilities:
+            arcpy.AddError(f"Cannot place {num_facilities} facilities with only {num_points} points")
             return
         
         # Run Lloyd's Algorithm
-        arcpy.AddMessage(f"Initialized {num_facilities} facilities randomly")
-        arcpy.AddMessage("")
-        
-        algorithm = LloydsAlgorithm(num_facilities, max_iterations, convergence_threshold, random_seed)
-        iteration_history = algorithm.run(points)
+        algorithm = LloydsAlgorithm(num_facilities, max_iterations, convergence_threshold,
+                                    random_seed, verbose)
+        iteration_history = algorithm.run(points_xy)
         
         # Create outputs - Pass the voronoi name directly into create_all_outputs
         arcpy.AddMessage("\nCreating output feature classes...")
@@ -201,7 +211,8 @@ def main():
         # Note: We pass the Voronoi name as the 5th optional argument here
         output_mgr.create_all_outputs(
             iteration_history,
-            points,
+            points_xy,
+            point_oids,
             output_facilities_name,
             output_iterations_name,
             output_assignments_name,
@@ -223,8 +234,11 @@ def main():
         arcpy.AddMessage("")
         
         arcpy.AddMessage("Final Facility Locations:")
-        for facility in iteration_history[-1]['facilities']:
-            arcpy.AddMessage(f"  Facility {facility['id']}: ({facility['x']:.2f}, {facility['y']:.2f})")
+        final_facilities = iteration_history[-1]['facilities']
+        for facility_id, x, y in zip(final_facilities['id'].tolist(),
+                                     final_facilities['x'].tolist(),
+                                     final_facilities['y'].tolist()):
+            arcpy.AddMessage(f"  Facility {facility_id}: ({x:.2f}, {y:.2f})")
         arcpy.AddMessage("")
         
         arcpy.AddMessage("Outputs created:")
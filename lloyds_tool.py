@@ -4,6 +4,7 @@ Handles all ArcGIS-specific tool interface logic
 """
 
 import arcpy
+import numpy as np
 import os
 from lloyds_algorithm import LloydsAlgorithm
 from output_manager import OutputManager
@@ -101,7 +102,23 @@ class LloydsAlgorithmTool(object):
             direction="Input")
         param8.value = "Voronoi_ServiceAreas"
         
-        return [param0, param1, param2, param3, param4, param5, param6, param7, param8]
+        param9 = arcpy.Parameter(
+            displayName="Random Seed",
+            name="random_seed",
+            datatype="GPLong",
+            parameterType="Optional",
+            direction="Input")
+        param9.value = 42
+        
+        param10 = arcpy.Parameter(
+            displayName="Verbose Messages",
+            name="verbose",
+            datatype="GPBoolean",
+            parameterType="Optional",
+            direction="Input")
+        param10.value = False
+        
+        return [param0, param1, param2, param3, param4, param5, param6, param7, param8, param9, param10]
     
     def isLicensed(self):
         """Set whether tool is licensed to execute"""
@@ -121,6 +138,9 @@ class LloydsAlgorithmTool(object):
             
         if parameters[3].value and parameters[3].value <= 0:
             parameters[3].setErrorMessage("Convergence threshold must be positive")
+            
+        if parameters[9].value is not None and parameters[9].value < 0:
+            parameters[9].setErrorMessage("Random seed must be zero or greater")
         return
     
     def execute(self, parameters, messages):
@@ -136,6 +156,8 @@ class LloydsAlgorithmTool(object):
         output_iterations_name = parameters[6].valueAsText
         output_assignments_name = parameters[7].valueAsText
         output_voronoi_name = parameters[8].valueAsText if parameters[8].valueAsText else None
+        random_seed = parameters[9].value if parameters[9].value is not None else 42
+        verbose = bool(parameters[10].value)
         
         # Configure environment
         arcpy.env.workspace = output_workspace
@@ -143,24 +165,26 @@ class LloydsAlgorithmTool(object):
         
         # Print header
         self._print_header(input_points, num_facilities, max_iterations, 
-                          convergence_threshold, output_voronoi_name)
+                          convergence_threshold, output_voronoi_name, random_seed)
         
         # Load demand points
-        points, spatial_ref = self._load_demand_points(input_points)
+        points_xy, point_oids, spatial_ref = self._load_demand_points(input_points)
         
-        if len(points) < num_facilities:
-            arcpy.AddError(f"Cannot place {num_facilities} facilities with only {len(points)} points")
+        if len(points_xy) < num_facilities:
+            arcpy.AddError(f"Cannot place {num_facilities} facilities with only {len(points_xy)} points")
             return
         
         # Run Lloyd's Algorithm
-        algorithm = LloydsAlgorithm(num_facilities, max_iterations, convergence_threshold)
-        iteration_history = algorithm.run(points)
+        algorithm = LloydsAlgorithm(num_facilities, max_iterations, convergence_threshold,
+                                    random_seed, verbose)
+        iteration_history = algorithm.run(points_xy)
         
         # Create outputs
         output_mgr = OutputManager(output_workspace, spatial_ref)
         output_mgr.create_all_outputs(
             iteration_history,
-            points,
+            points_xy,
+            point_oids,
             output_facilities_name,
             output_iterations_name,
             output_assignments_name,
@@ -180,7 +204,7 @@ class LloydsAlgorithmTool(object):
         return
     
     def _print_header(self, input_points, num_facilities, max_iterations, 
-                     convergence_threshold, voronoi_name):
+                     convergence_threshold, voronoi_name, random_seed):
         """Print tool execution header"""
         arcpy.AddMessage("=" * 60)
         arcpy.AddMessage("LLOYD'S ALGORITHM FOR OPTIMAL FACILITY LOCATION")
@@ -189,22 +213,22 @@ class LloydsAlgorithmTool(object):
         arcpy.AddMessage(f"Number of facilities: {num_facilities}")
         arcpy.AddMessage(f"Maximum iterations: {max_iterations}")
         arcpy.AddMessage(f"Convergence threshold: {convergence_threshold}")
+        arcpy.AddMessage(f"Random seed: {random_seed}")
         if voronoi_name:
             arcpy.AddMessage(f"Creating Voronoi polygons: Yes")
         arcpy.AddMessage("")
     
     def _load_demand_points(self, input_points):
-        """Load demand points from feature class"""
-        points = []
+        """Load demand point coordinates and OIDs from feature class into arrays"""
         spatial_ref = arcpy.Describe(input_points).spatialReference
+        records = arcpy.da.FeatureClassToNumPyArray(input_points, ["SHAPE@XY", "OID@"])
+        points_xy = np.ascontiguousarray(records["SHAPE@XY"], dtype=np.float64)
+        point_oids = records["OID@"].astype(np.int64)
+        num_points = len(points_xy)
         
-        with arcpy.da.SearchCursor(input_points, ["SHAPE@XY", "OID@"]) as cursor:
-            for row in cursor:
-                points.append({"xy": row[0], "oid": row[1]})
-        
-        arcpy.AddMessage(f"Loaded {len(points)} demand points")
+        arcpy.AddMessage(f"Loaded {num_points} demand points")
         arcpy.AddMessage("")
-        return points, spatial_ref
+        return points_xy, point_oids, spatial_ref
     
     def _print_summary(self, iteration_history, facilities_name, iterations_name, 
                       assignments_name, voronoi_name=None):
@@ -223,8 +247,11 @@ class LloydsAlgorithmTool(object):
         arcpy.AddMessage("")
         
         arcpy.AddMessage("Final Facility Locations:")
-        for facility in iteration_history[-1]['facilities']:
-            arcpy.AddMessage(f"  Facility {facility['id']}: ({facility['x']:.2f}, {facility['y']:.2f})")
+        final_facilities = iteration_history[-1]['facilities']
+        for facility_id, x, y in zip(final_facilities['id'].tolist(),
+                                     final_facilities['x'].tolist(),
+                                     final_facilities['y'].tolist()):
+            arcpy.AddMessage(f"  Facility {facility_id}: ({x:.2f}, {y:.2f})")
         arcpy.AddMessage("")
         
         arcpy.AddMessage("Outputs created:")
@@ -4,7 +4,9 @@ Handles creation of all output feature classes
 """
 
 import arcpy
-from geometry_utils import GeometryUtils
+import contextlib
+import os
+import numpy as np
 from lloyds_algorithm import LloydsAlgorithm
 
 
@@ -21,10 +23,9 @@ class OutputManager:
         """
         self.workspace = workspace
         self.spatial_ref = spatial_reference
-        self.geo_utils = GeometryUtils()
 
     
-    def create_all_outputs(self, iteration_history, points, 
+    def create_all_outputs(self, iteration_history, points_xy, point_oids,
                       facilities_name, iterations_name, assignments_name, 
                       voronoi_name=None):
         """
@@ -32,7 +33,8 @@ class OutputManager:
         
         Args:
             iteration_history: List of iteration dictionaries
-            points: List of demand points
+            points_xy: (N, 2) array of demand point coordinates
+            point_oids: (N,) array of demand point OIDs
             facilities_name: Name for facilities output
             iterations_name: Name for iterations output
             assignments_name: Name for assignments output
@@ -40,55 +42,46 @@ class OutputManager:
         """
         arcpy.AddMessage("\nCreating output feature classes...")
         
-        # Get final state
+        # Get final state; the facility record array is shared by every output below
         final_facilities = iteration_history[-1]["facilities"]
         final_assignments = iteration_history[-1]["assignments"]
         
         # Create outputs
         self.create_facilities_output(final_facilities, facilities_name)
         self.create_iterations_output(iteration_history, iterations_name)
-        self.create_assignments_output(points, final_facilities, 
+        self.create_assignments_output(points_xy, point_oids, final_facilities,
                                     final_assignments, assignments_name)
         
         # Create Voronoi polygons if requested (pass points for extent)
         if voronoi_name:
-            self.create_voronoi_polygons(final_facilities, points, None, voronoi_name)
+            self.create_voronoi_polygons(final_facilities, points_xy, None, voronoi_name)
     
     def create_facilities_output(self, facilities, output_name):
         """
         Create feature class for final facility locations
         
         Args:
-            facilities: List of facility dictionaries
+            facilities: FACILITY_DTYPE array of facility IDs and coordinates
             output_name: Name of output feature class
         """
-        output_fc = output_name
-        
-        # Create feature class
-        arcpy.CreateFeatureclass_management(
-            self.workspace, 
-            output_fc, 
-            "POINT", 
-            spatial_reference=self.spatial_ref
-        )
-        
-        # Add fields
-        arcpy.AddField_management(output_fc, "Facility_ID", "LONG")
-        arcpy.AddField_management(output_fc, "X_Coord", "DOUBLE")
-        arcpy.AddField_management(output_fc, "Y_Coord", "DOUBLE")
-        
-        # Insert features
-        fields = ["SHAPE@XY", "Facility_ID", "X_Coord", "Y_Coord"]
-        with arcpy.da.InsertCursor(output_fc, fields) as cursor:
-            for facility in facilities:
-                cursor.insertRow([
-                    (facility["x"], facility["y"]),
-                    facility["id"],
-                    facility["x"],
-                    facility["y"]
-                ])
-        
-        arcpy.AddMessage(f"  Created {output_fc}")
+        num_facilities = len(facilities)
+        
+        # One record per facility, written in a single bulk call
+        records = np.empty(num_facilities, dtype=[
+            ("XY", "<f8", 2),
+            ("Facility_ID", "<i4"),
+            ("X_Coord", "<f8"),
+            ("Y_Coord", "<f8")
+        ])
+        records["XY"][:, 0] = facilities["x"]
+        records["XY"][:, 1] = facilities["y"]
+        records["Facility_ID"] = facilities["id"]
+        records["X_Coord"] = facilities["x"]
+        records["Y_Coord"] = facilities["y"]
+        
+        self._write_points(records, output_name)
+        
+        arcpy.AddMessage(f"  Created {output_name}")
     
     def create_iterations_output(self, iteration_history, output_name):
         """
@@ -98,52 +91,72 @@ class OutputManager:
             iteration_history: List of iteration dictionaries
             output_name: Name of output feature class
         """
-        output_fc = output_name
-        
-        # Create feature class
-        arcpy.CreateFeatureclass_management(
-            self.workspace,
-            output_fc,
-            "POINT",
-            spatial_reference=self.spatial_ref
-        )
+        # One record per facility per iteration, built column by column
+        num_facilities = len(iteration_history[0]["facilities"])
+        num_rows = num_facilities * len(iteration_history)
+        
+        records = np.empty(num_rows, dtype=[
+            ("XY", "<f8", 2),
+            ("Iteration", "<i4"),
+            ("Facility_ID", "<i4"),
+            ("Objective", "<f8"),
+            ("X_Coord", "<f8"),
+            ("Y_Coord", "<f8"),
+            ("Cluster_Size", "<i4")
+        ])
+        stacked = np.concatenate([it["facilities"] for it in iteration_history])
+        records["XY"][:, 0] = stacked["x"]
+        records["XY"][:, 1] = stacked["y"]
+        records["Iteration"] = np.repeat([it["iteration"] for it in iteration_history], num_facilities)
+        records["Facility_ID"] = stacked["id"]
+        records["Objective"] = np.repeat([it["objective"] for it in iteration_history], num_facilities)
+        records["X_Coord"] = stacked["x"]
+        records["Y_Coord"] = stacked["y"]
+        records["Cluster_Size"] = np.concatenate([it["cluster_sizes"] for it in iteration_history])
+        
+        self._write_points(records, output_name)
+        
+        arcpy.AddMessage(f"  Created {output_name}")
+    
+    def _write_points(self, records, output_name):
+        """
+        Write a structured array to a new point feature class in one call
         
-        # Add fields
-        arcpy.AddField_management(output_fc, "Iteration", "LONG")
-        arcpy.AddField_management(output_fc, "Facility_ID", "LONG")
-        arcpy.AddField_management(output_fc, "Objective", "DOUBLE")
-        arcpy.AddField_management(output_fc, "X_Coord", "DOUBLE")
-        arcpy.AddField_management(output_fc, "Y_Coord", "DOUBLE")
-        arcpy.AddField_management(output_fc, "Cluster_Size", "LONG")
+        Args:
+            records: Structured array with an 'XY' (x, y) field for the geometry
+                and one field per attribute
+            output_name: Name of output feature class
+        """
+        output_path = os.path.join(self.workspace, output_name)
         
-        # Insert features
-        fields = ["SHAPE@XY", "Iteration", "Facility_ID", "Objective", 
-                 "X_Coord", "Y_Coord", "Cluster_Size"]
+        # NumPyArrayToFeatureClass will not replace an existing output
+        if arcpy.Exists(output_path):
+            arcpy.Delete_management(output_path)
         
-        with arcpy.da.InsertCursor(output_fc, fields) as cursor:
-            for iter_data in iteration_history:
-                for i, facility in enumerate(iter_data["facilities"]):
-                    cluster_size = iter_data["cluster_sizes"][i]
-                    cursor.insertRow([
-                        (facility["x"], facility["y"]),
-                        iter_data["iteration"],
-                        facility["id"],
-                        iter_data["objective"],
-                        facility["x"],
-                        facility["y"],
-                        cluster_size
-                    ])
+        arcpy.da.NumPyArrayToFeatureClass(records, output_path, ["XY"], self.spatial_ref)
+    
+    def _edit_session(self):
+        """
+        Edit session that batches cursor writes into one transaction
         
-        arcpy.AddMessage(f"  Created {output_fc}")
+        Returns:
+            arcpy.da.Editor for file and personal geodatabases, otherwise a no-op context
+        """
+        # Only local geodatabases get an edit session; shapefile folders do not
+        # support one, and enterprise geodatabases need versioning settings
+        if arcpy.Describe(self.workspace).workspaceType == "LocalDatabase":
+            return arcpy.da.Editor(self.workspace)
+        return contextlib.nullcontext()
     
-    def create_assignments_output(self, points, facilities, assignments, output_name):
+    def create_assignments_output(self, points_xy, point_oids, facilities, assignments, output_name):
         """
         Create feature class showing point assignments
         
         Args:
-            points: List of demand points
-            facilities: List of facility locations
-            assignments: List of facility assignments
+            points_xy: (N, 2) array of demand point coordinates
+            point_oids: (N,) array of demand point OIDs
+            facilities: FACILITY_DTYPE array of facility IDs and coordinates
+            assignments: Array of facility IDs (one per point)
             output_name: Name of output feature class
         """
         output_fc = output_name
@@ -157,125 +170,125 @@ class OutputManager:
         )
         
         # Add fields
-        arcpy.AddField_management(output_fc, "Point_OID", "LONG")
-        arcpy.AddField_management(output_fc, "Assigned_Facility", "LONG")
-        arcpy.AddField_management(output_fc, "Distance", "DOUBLE")
-        arcpy.AddField_management(output_fc, "Facility_X", "DOUBLE")
-        arcpy.AddField_management(output_fc, "Facility_Y", "DOUBLE")
+        arcpy.management.AddFields(output_fc, [
+            ["Point_OID", "LONG"],
+            ["Assigned_Facility", "LONG"],
+            ["Distance", "DOUBLE"],
+            ["Facility_X", "DOUBLE"],
+            ["Facility_Y", "DOUBLE"]
+        ])
         
         # Insert features
         fields = ["SHAPE@XY", "Point_OID", "Assigned_Facility", 
                  "Distance", "Facility_X", "Facility_Y"]
         
-        with arcpy.da.InsertCursor(output_fc, fields) as cursor:
-            for i, point in enumerate(points):
-                facility_id = assignments[i]
-                facility = facilities[facility_id]
-                
-                dist = self.geo_utils.euclidean_distance(
-                    point["xy"][0], point["xy"][1],
-                    facility["x"], facility["y"]
-                )
-                
+        # Gather each point's facility and measure all distances in one pass
+        # Coordinates indexed by facility ID, so lookups never depend on row order
+        facility_xy = np.empty((facilities["id"].max() + 1, 2), dtype=np.float64)
+        facility_xy[facilities["id"], 0] = facilities["x"]
+        facility_xy[facilities["id"], 1] = facilities["y"]
+        assigned_xy = facility_xy[np.asarray(assignments, dtype=np.intp)]
+        delta = assigned_xy - points_xy
+        distances = np.hypot(delta[:, 0], delta[:, 1])
+        
+        with self._edit_session(), arcpy.da.InsertCursor(output_fc, fields) as cursor:
+            for point_xy, oid, facility_id, dist, (fx, fy) in zip(
+                    points_xy.tolist(), point_oids.tolist(), assignments.tolist(),
+                    distances.tolist(), assigned_xy.tolist()):
                 cursor.insertRow([
-                    point["xy"],
-                    point["oid"],
+                    tuple(point_xy),
+                    oid,
                     facility_id,
                     dist,
-                    facility["x"],
-                    facility["y"]
+                    fx,
+                    fy
                 ])
         
         arcpy.AddMessage(f"  Created {output_fc}")
 
-    def create_voronoi_polygons(self, facilities, points, iteration_num, output_name):
+    def create_voronoi_polygons(self, facilities, points_xy, iteration_num, output_name):
         """
         Create Voronoi (Thiessen) polygons for facility locations
         
         Args:
-            facilities: List of facility dictionaries
-            points: List of demand points (to set proper extent)
+            facilities: FACILITY_DTYPE array of facility IDs and coordinates
+            points_xy: (N, 2) array of demand point coordinates (to set proper extent)
             iteration_num: Which iteration (for naming/filtering), can be None
             output_name: Name for output feature class
         """
-        import os
-        
         arcpy.AddMessage(f"  Creating Voronoi polygons...")
         
         # Step 1: Calculate extent from demand points (not just facilities)
-        all_x = [p["xy"][0] for p in points]
-        all_y = [p["xy"][1] for p in points]
+        xy_min = points_xy.min(axis=0)
+        xy_max = points_xy.max(axis=0)
         
         # Add some buffer (10% on each side)
-        x_range = max(all_x) - min(all_x)
-        y_range = max(all_y) - min(all_y)
+        xy_range = xy_max - xy_min
         buffer_pct = 0.1
+        lower = (xy_min - xy_range * buffer_pct).tolist()
+        upper = (xy_max + xy_range * buffer_pct).tolist()
         
-        extent_str = f"{min(all_x) - x_range * buffer_pct} {min(all_y) - y_range * buffer_pct} {max(all_x) + x_range * buffer_pct} {max(all_y) + y_range * buffer_pct}"
+        extent_str = f"{lower[0]} {lower[1]} {upper[0]} {upper[1]}"
         
-        # Step 2: Create temporary point feature class for facilities
         temp_facilities = "temp_facilities_voronoi"
-        temp_fc_path = os.path.join(self.workspace, temp_facilities)
-        
-        # Delete if exists
-        if arcpy.Exists(temp_fc_path):
-            arcpy.Delete_management(temp_fc_path)
-        
-        arcpy.CreateFeatureclass_management(
-            self.workspace,
-            temp_facilities,
-            "POINT",
-            spatial_reference=self.spatial_ref
-        )
-        
-        arcpy.AddField_management(temp_fc_path, "Facility_ID", "LONG")
-        
-        # Insert facility points
-        with arcpy.da.InsertCursor(temp_fc_path, ["SHAPE@XY", "Facility_ID"]) as cursor:
-            for facility in facilities:
-                cursor.insertRow([
-                    (facility["x"], facility["y"]),
-                    facility["id"]
-                ])
-        
-        # Step 3: Create Thiessen (Voronoi) polygons with proper extent
+        temp_fc_path = f"in_memory/{temp_facilities}"
         output_fc = output_name
         output_path = os.path.join(self.workspace, output_fc)
         
-        # Delete if exists
-        if arcpy.Exists(output_path):
-            arcpy.Delete_management(output_path)
-        
-        # Set environment extent before creating Thiessen polygons
+        # Let the tools below replace existing data instead of probing for it.
+        # The settings are restored and the temp data removed even on failure.
+        original_overwrite = arcpy.env.overwriteOutput
         original_extent = arcpy.env.extent
-        arcpy.env.extent = extent_str
-        
-        arcpy.analysis.CreateThiessenPolygons(
-            in_features=temp_fc_path,
-            out_feature_class=output_path,
-            fields_to_copy="ALL"
-        )
-        
-        # Restore original extent
-        arcpy.env.extent = original_extent
-        
-        # Step 4: Add iteration field if needed
-        if iteration_num is not None:
-            arcpy.AddField_management(output_path, "Iteration", "LONG")
-            with arcpy.da.UpdateCursor(output_path, ["Iteration"]) as cursor:
-                for row in cursor:
-                    row[0] = iteration_num
-                    cursor.updateRow(row)
-        
-        # Step 5: Add area field
-        arcpy.AddField_management(output_path, "Area_SqUnits", "DOUBLE")
-        with arcpy.da.UpdateCursor(output_path, ["SHAPE@AREA", "Area_SqUnits"]) as cursor:
-            for row in cursor:
-                row[1] = row[0]
-                cursor.updateRow(row)
-        
-        # Step 6: Clean up temporary data
-        arcpy.Delete_management(temp_fc_path)
+        arcpy.env.overwriteOutput = True
+        try:
+            # Step 2: Create temporary point feature class for facilities in memory
+            arcpy.CreateFeatureclass_management(
+                "in_memory",
+                temp_facilities,
+                "POINT",
+                spatial_reference=self.spatial_ref
+            )
+            
+            arcpy.AddField_management(temp_fc_path, "Facility_ID", "LONG")
+            
+            # Insert facility points
+            with arcpy.da.InsertCursor(temp_fc_path, ["SHAPE@XY", "Facility_ID"]) as cursor:
+                for facility_id, x, y in zip(facilities["id"].tolist(),
+                                             facilities["x"].tolist(),
+                                             facilities["y"].tolist()):
+                    cursor.insertRow([
+                        (x, y),
+                        facility_id
+                    ])
+            
+            # Step 3: Create Thiessen (Voronoi) polygons with proper extent
+            arcpy.env.extent = extent_str
+            try:
+                arcpy.analysis.CreateThiessenPolygons(
+                    in_features=temp_fc_path,
+                    out_feature_class=output_path,
+                    fields_to_copy="ALL"
+                )
+            finally:
+                # Restore original extent
+                arcpy.env.extent = original_extent
+            
+            # Step 4: Add iteration field (if needed) and area field in one call
+            new_fields = [["Area_SqUnits", "DOUBLE"]]
+            if iteration_num is not None:
+                new_fields.insert(0, ["Iteration", "LONG"])
+            arcpy.management.AddFields(output_path, new_fields)
+            
+            # Step 5: Fill area and iteration fields together in one pass
+            field_values = [["Area_SqUnits", "!shape.area!"]]
+            if iteration_num is not None:
+                field_values.insert(0, ["Iteration", str(iteration_num)])
+            arcpy.management.CalculateFields(output_path, "PYTHON3", field_values)
+        finally:
+            # Step 6: Restore the overwrite setting and clean up temporary data
+            arcpy.env.overwriteOutput = original_overwrite
+            if arcpy.Exists(temp_fc_path):
+                arcpy.Delete_management(temp_fc_path)
         
         arcpy.AddMessage(f"  Created {output_fc}")
         
@@ -1,71 +1,125 @@
 import time
-import random
-import math
 import numpy as np
-import matplotlib.pyplot as plt
+
+try:
+    from numba import njit
+except ImportError:  # Optional - without it the same functions run as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
 #------------------------------------------------------------------------------
 # Customization section:
 initial_temperature = 100
 cooling = 0.8  # cooling coefficient
-number_variables = 2
 upper_bounds = [3, 3]   
 lower_bounds = [-3, -3]  
 computing_time = 1 # second(s)
+min_acceptance_rate = 0.01 # stop once fewer moves than this are accepted at a level
+min_temperature = 1e-12 # stop once the temperature has effectively reached zero
   
+@njit(cache=True, fastmath=True)
 def objective_function(X):
     x=X[0]
     y=X[1]
-    value = 3*(1-x)**2*math.exp(-x**2 - (y+1)**2) - 10*(x/5 - x**3 - y**5)*math.exp(-x**2 - y**2) -1/3*math.exp(-(x+1)**2 - y**2)
+    value = 3*(1-x)**2*np.exp(-x**2 - (y+1)**2) - 10*(x/5 - x**3 - y**5)*np.exp(-x**2 - y**2) -1/3*np.exp(-(x+1)**2 - y**2)
     return value
+
+@njit(cache=True, error_model="numpy")
+def _sa_inner(current_solution, best_solution, best_fitness, EA, current_temperature,
+              lower_bounds, upper_bounds, n, first_level, steps, draws):
+    # All attempts at one temperature level, compiled as a single loop.
+    # steps holds the pre-drawn perturbation of every attempt and draws the
+    # acceptance samples, so no random numbers are generated in here.
+    inv_temperature = 1.0/current_temperature
+    for j in range(steps.shape[0]):
   
-#------------------------------------------------------------------------------
-# Simulated Annealing Algorithm:
-initial_solution=np.zeros((number_variables))
-for v in range(number_variables):
-    initial_solution[v] = random.uniform(lower_bounds[v],upper_bounds[v])
-      
-current_solution = initial_solution
-best_solution = initial_solution
-n = 1  # no of solutions accepted
-best_fitness = objective_function(best_solution)
-current_temperature = initial_temperature # current temperature
-start = time.time()
-no_attempts = 100 # number of attempts in each level of temperature
-record_best_fitness =[]
-  
-for i in range(9999999):
-    for j in range(no_attempts):
-  
-        for k in range(number_variables):
-            current_solution[k] = best_solution[k] + 0.1*(random.uniform(lower_bounds[k],upper_bounds[k]))
+        # current_solution is a preallocated proposal buffer, best_solution is updated in place
+        for k in range(current_solution.shape[0]):
+            current_solution[k] = best_solution[k] + steps[j, k]
             current_solution[k] = max(min(current_solution[k], upper_bounds[k]), lower_bounds[k])
 
         current_fitness = objective_function(current_solution)
         E = abs(current_fitness - best_fitness)
-        if i == 0 and j == 0:
+        if first_level and j == 0:
             EA = E
         
         if current_fitness < best_fitness:
-            p = math.exp(-E/(EA*current_temperature))
+            p = np.exp(-E/EA*inv_temperature)
             # decide to accept worse solution or not
-            if random.random()<p:
+            if draws[j]<p:
                 accept = True
             else:
                 accept = False
         else:
             accept = True
         if accept == True:
-            best_solution = current_solution
-            best_fitness = objective_function(best_solution)
+            best_solution[:] = current_solution
+            best_fitness = current_fitness
             n = n + 1
             EA = (EA *(n - 1) + E)/n
+    return best_fitness, EA, n
+  
+#------------------------------------------------------------------------------
+# Simulated Annealing Algorithm:
+def run_sa(initial_temperature=initial_temperature, cooling=cooling,
+           lower_bounds=lower_bounds, upper_bounds=upper_bounds,
+           computing_time=computing_time, no_attempts=100, seed=None):
+    """
+    Run simulated annealing with the customization settings as defaults
+    
+    All random numbers come from one NumPy Generator seeded with seed, so a
+    fixed seed reproduces a run unless computing_time cuts it short. Nothing
+    is printed; the caller reports the returned record.
+    
+    Returns:
+        Tuple of (best solution, best fitness, best fitness per temperature level)
+    """
+    rng = np.random.default_rng(seed)
+    lower_bounds = np.asarray(lower_bounds, dtype=np.float64)
+    upper_bounds = np.asarray(upper_bounds, dtype=np.float64)
+    number_variables = len(lower_bounds)
+    initial_solution = rng.uniform(lower_bounds, upper_bounds)
+          
+    current_solution = np.empty(number_variables)
+    best_solution = initial_solution.copy()
+    n = 1  # no of solutions accepted
+    best_fitness = objective_function(best_solution)
+    current_temperature = float(initial_temperature) # current temperature
+    record_best_fitness =[]
+    EA = 0.0
+      
+    # Compile _sa_inner before the clock starts so JIT time is not charged to
+    # computing_time. Zero attempts leaves every argument untouched.
+    _sa_inner(current_solution.copy(), best_solution.copy(), best_fitness, EA, current_temperature,
+              lower_bounds, upper_bounds, n, True,
+              np.empty((0, number_variables)), np.empty(0))
+    start = time.time()
+      
+    for i in range(9999999):
+        # Draw the random numbers for this temperature level in bulk
+        steps = 0.1*rng.uniform(lower_bounds, upper_bounds, size=(no_attempts, number_variables))
+        draws = rng.random(no_attempts)
+        accepted_before = n
+        best_fitness, EA, n = _sa_inner(
+            current_solution, best_solution, best_fitness, EA, current_temperature,
+            lower_bounds, upper_bounds, n, i == 0, steps, draws)
+
+        record_best_fitness.append(best_fitness)
+        # cooling the temperature
+        current_temperature = current_temperature*cooling
+        # Stop by computing time
+        end = time.time()
+        if end-start >= computing_time:
+            break
+        # Stop once the search is frozen: almost nothing accepted or no temperature left
+        if (n - accepted_before)/no_attempts < min_acceptance_rate or current_temperature < min_temperature:
+            break
+    return best_solution, best_fitness, record_best_fitness
 
-    print('iteration: {}, best_solution: {}, best_fitness: {}'.format(i, best_solution, best_fitness))
-    record_best_fitness.append(best_fitness)
-    # cooling the temperature
-    current_temperature = current_temperature*cooling
-    # Stop by computing time
-    end = time.time()
-    if end-start >= computing_time:
-        break
-plt.plot(record_best_fitness)
+if __name__ == "__main__":
+    # Plotting is only needed when run as a script
+    import matplotlib.pyplot as plt
+    best_solution, best_fitness, record_best_fitness = run_sa()
+    for i, level_fitness in enumerate(record_best_fitness):
+        print('iteration: {}, best_fitness: {}'.format(i, level_fitness))
+    print('best_solution: {}, best_fitness: {}'.format(best_solution, best_fitness))
+    plt.plot(record_best_fitness)